@@ -83,6 +83,20 @@ class AuthService:
             )
         
         return username
+    
+    def require_admin(self, request: Request) -> str:
+        """
+        Require an authenticated admin user and return username.
+        Raises HTTPException if the user is not an admin.
+        """
+        username = self.require_auth(request)
+        if username not in settings.admin_users:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin privileges required"
+            )
+        
+        return username
 
 
 # Global auth service instance
@@ -0,0 +1,113 @@
+"""
+Compression benchmark.
+
+Measures CPU time per request against bytes saved for each encoding,
+comparing per-request compression with cached precompressed bodies.
+The cached mode reports both the one-off cost of building the variant
+and the per-request cost of serving it from the cache.
+
+Usage (from the backend directory):
+    python benchmarks/compression_benchmark.py [--iterations N]
+    python benchmarks/compression_benchmark.py --sweep
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compression import SUPPORTED_ENCODINGS, CompressedBodyCache, brotli, compress  # noqa: E402
+
+USER_COUNTS = (10, 100, 1000)
+
+FIRST_NAMES = ("Leanne", "Ervin", "Clementine", "Patricia", "Chelsey", "Dennis",
+               "Kurtis", "Nicholas", "Glenna", "Clementina", "Mariah", "Aurelio")
+LAST_NAMES = ("Graham", "Howell", "Bauch", "Lebsack", "Dietrich", "Schulist",
+              "Weissnat", "Runolfsdottir", "Reichert", "DuBuque", "Koepp", "Kihn")
+DOMAINS = ("april.biz", "melissa.tv", "yesenia.net", "kory.org", "annie.ca",
+           "jasper.info", "billy.biz", "rosamond.me", "dana.io", "karina.biz")
+
+
+def build_users_body(count: int, seed: int = 0) -> bytes:
+    """Build a /users response body with JSONPlaceholder-like users."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        items.append({
+            "id": i,
+            "name": f"{first} {last}",
+            "email": f"{first}.{last}{rng.randint(1, 9999)}@{rng.choice(DOMAINS)}",
+        })
+    return json.dumps({"items": items, "count": count}).encode("utf-8")
+
+
+def cpu_per_call(func, iterations: int) -> float:
+    """Return the average CPU time of a call in microseconds."""
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def run(iterations: int) -> None:
+    """Compare per-request compression with cached variants at the configured levels."""
+    print(f"{'users':>6} {'encoding':>9} {'mode':>8} {'bytes in':>9} {'bytes out':>9} "
+          f"{'saved':>7} {'build us':>9} {'cpu us/req':>11}")
+
+    for user_count in USER_COUNTS:
+        body = build_users_body(user_count)
+
+        for encoding in SUPPORTED_ENCODINGS:
+            per_request = compress(body, encoding)
+            per_request_cpu = cpu_per_call(lambda: compress(body, encoding), iterations)
+
+            # One-off cost of building the cached variant, averaged over fresh caches
+            build_cpu = cpu_per_call(
+                lambda: CompressedBodyCache().get_or_compress("users", 1, body, encoding),
+                max(1, iterations // 10),
+            )
+            cache = CompressedBodyCache()
+            cached = cache.get_or_compress("users", 1, body, encoding)
+            hit_cpu = cpu_per_call(
+                lambda: cache.get_or_compress("users", 1, body, encoding), iterations
+            )
+
+            for mode, output, build, cpu in (
+                ("per-req", per_request, None, per_request_cpu),
+                ("cached", cached, build_cpu, hit_cpu),
+            ):
+                saved = 1 - len(output) / len(body)
+                build_text = f"{build:>9.1f}" if build is not None else f"{'-':>9}"
+                print(f"{user_count:>6} {encoding:>9} {mode:>8} {len(body):>9} "
+                      f"{len(output):>9} {saved:>7.1%} {build_text} {cpu:>11.1f}")
+
+
+def sweep(iterations: int) -> None:
+    """Report size and build cost at every level, for choosing the configured levels."""
+    encoders = [("gzip", level, lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0))
+                for level in range(1, 10)]
+    if brotli is not None:
+        encoders += [("br", quality, lambda body, quality=quality: brotli.compress(body, quality=quality))
+                     for quality in range(0, 12)]
+
+    print(f"{'users':>6} {'encoding':>9} {'level':>6} {'bytes out':>9} {'saved':>7} {'build us':>10}")
+    for user_count in USER_COUNTS:
+        body = build_users_body(user_count)
+        for encoding, level, encode in encoders:
+            output = encode(body)
+            build = cpu_per_call(lambda: encode(body), max(1, iterations // 10))
+            print(f"{user_count:>6} {encoding:>9} {level:>6} {len(output):>9} "
+                  f"{1 - len(output) / len(body):>7.1%} {build:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compression CPU vs bytes saved benchmark.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sweep", action="store_true", help="report every compression level")
+    args = parser.parse_args()
+    (sweep if args.sweep else run)(args.iterations)
@@ -0,0 +1,347 @@
+"""
+Storage-layer microbenchmarks.
+
+Times JSONDatabaseService operations on generated user datasets and records
+ops/sec, latency percentiles and peak memory per operation. Each operation
+is repeated over several rounds on fresh copies of the dataset. Regressions
+are judged on the fastest call, the best round and peak memory, which stay
+stable between runs where medians and tail percentiles do not, and are
+re-measured before being reported. Results are written to JSON and can be
+compared against a stored baseline.
+
+Usage (from the backend directory):
+    python benchmarks/storage_benchmark.py --output results.json
+    python benchmarks/storage_benchmark.py --save-baseline
+    python benchmarks/storage_benchmark.py --baseline benchmarks/storage_baseline.json
+"""
+import argparse
+import gc
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database_service import DatabaseServiceFactory, JSONDatabaseService  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "storage_baseline.json"
+DEFAULT_ROUNDS = 5
+# Back-to-back runs of unchanged code moved the gated metrics by up to ~11%,
+# while medians swung by 30-50%
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_CONFIRM_RUNS = 1
+
+# Backend name -> factory taking the dataset path
+BACKENDS: Dict[str, Callable[[Path], JSONDatabaseService]] = {
+    "json": DatabaseServiceFactory.create_service,
+}
+
+# Operation name -> callable(db, dataset size, iteration index)
+OPERATIONS: Dict[str, Callable[[JSONDatabaseService, int, int], Any]] = {
+    "find_by_field": lambda db, size, i: db.find_by_field("username", f"user{(size // 2 + i) % size + 1}"),
+    "add_item": lambda db, size, i: db.add_item(generate_user(size + i + 1)),
+    "update_item": lambda db, size, i: db.update_item(str(size // 2 + 1), "id", {"email": f"updated{i}@example.com"}),
+    "remove_item": lambda db, size, i: db.remove_item(str(size // 2 + i + 1), "id"),
+    "get_next_id": lambda db, size, i: db.get_next_id("id"),
+}
+
+# Operations that return False when they did nothing; timing those would
+# measure a scan without the save
+MUST_SUCCEED = {"update_item", "remove_item"}
+
+
+def generate_user(user_id: int) -> Dict[str, str]:
+    """Build a single user record in the database file format."""
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "password": f"password{user_id}",
+        "email": f"user{user_id}@example.com",
+    }
+
+
+def generate_dataset(path: Path, size: int) -> None:
+    """Write a users database file with ``size`` records."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump([generate_user(i) for i in range(1, size + 1)], file, indent=2)
+
+
+def default_iterations(size: int) -> int:
+    """Scale iterations down as every operation rewrites the whole file."""
+    return max(3, min(100, 200_000 // size))
+
+
+def max_iterations(name: str, size: int) -> Optional[int]:
+    """Upper bound on timed calls per round, excluding the warm-up call."""
+    if name == "remove_item":
+        # Ids size // 2 + 1 .. size are removable, one of them by the warm-up
+        return size - size // 2 - 1
+    return None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure_peak_memory(operation: Callable, db: JSONDatabaseService, size: int, iteration: int) -> int:
+    """Return peak bytes allocated by a single operation call."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        operation(db, size, iteration)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def call(name: str, operation: Callable, db: JSONDatabaseService, size: int, iteration: int) -> None:
+    """Run one operation, failing loudly if it did not do its work."""
+    result = operation(db, size, iteration)
+    if name in MUST_SUCCEED and result is not True:
+        raise RuntimeError(f"{name} call {iteration} on {size} records did nothing")
+
+
+def run_round(backend: str, name: str, dataset: Path, workdir: Path, size: int,
+              iterations: int, measure_memory: bool) -> Dict[str, Any]:
+    """Time one round of an operation on a fresh copy of the dataset."""
+    db_path = workdir / f"{backend}-{name}-{size}.json"
+    shutil.copyfile(dataset, db_path)
+    db = BACKENDS[backend](db_path)
+    operation = OPERATIONS[name]
+
+    # Warm the page cache so the first sample is not an outlier
+    call(name, operation, db, size, 0)
+
+    latencies = []
+    # Collector pauses land on random samples; keep them out of the timings
+    gc.disable()
+    try:
+        for i in range(1, iterations + 1):
+            start = time.perf_counter()
+            call(name, operation, db, size, i)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    peak_bytes = None
+    if measure_memory:
+        # Rewind the copy so the measured call is a normal one
+        shutil.copyfile(dataset, db_path)
+        peak_bytes = measure_peak_memory(lambda *args: call(name, operation, *args), db, size, 1)
+    db_path.unlink()
+    return {"latencies": latencies, "peak_bytes": peak_bytes}
+
+
+def run_operation(backend: str, name: str, dataset: Path, workdir: Path, size: int,
+                  iterations: int, rounds: int, measure_memory: bool) -> Dict[str, Any]:
+    """Benchmark one operation over several rounds."""
+    limit = max_iterations(name, size)
+    if limit is not None:
+        iterations = min(iterations, limit)
+
+    round_results = [
+        run_round(backend, name, dataset, workdir, size, iterations, measure_memory)
+        for _ in range(rounds)
+    ]
+
+    round_ops = sorted(iterations / sum(r["latencies"]) for r in round_results)
+    latencies = sorted(latency for r in round_results for latency in r["latencies"])
+    peaks = [r["peak_bytes"] for r in round_results if r["peak_bytes"] is not None]
+    return {
+        "backend": backend,
+        "operation": name,
+        "size": size,
+        "iterations": iterations,
+        "rounds": rounds,
+        "ops_per_sec": statistics.median(round_ops),
+        "ops_per_sec_best": round_ops[-1],
+        "latency_ms": {
+            "min": latencies[0] * 1000,
+            "mean": statistics.fmean(latencies) * 1000,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000,
+        },
+        "peak_memory_bytes": int(statistics.median(peaks)) if peaks else None,
+    }
+
+
+def run(sizes: List[int], backends: List[str], operations: List[str],
+        iterations: int, rounds: int, measure_memory: bool) -> Dict[str, Any]:
+    """Run every backend/size/operation combination."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="storage-bench-") as tmp:
+        workdir = Path(tmp)
+        for size in sizes:
+            dataset = workdir / f"dataset-{size}.json"
+            generate_dataset(dataset, size)
+            for backend in backends:
+                for name in operations:
+                    result = run_operation(
+                        backend, name, dataset, workdir, size,
+                        iterations or default_iterations(size), rounds, measure_memory,
+                    )
+                    results.append(result)
+                    print_result(result)
+            dataset.unlink()
+
+    return {
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    """Print one result row."""
+    latency = result["latency_ms"]
+    peak = result["peak_memory_bytes"]
+    peak_mb = f"{peak / 1024 / 1024:.1f}" if peak is not None else "-"
+    print(f"{result['backend']:>6} {result['size']:>9} {result['operation']:>14} "
+          f"{result['ops_per_sec']:>10.1f} ops/s (best {result['ops_per_sec_best']:>10.1f})  "
+          f"min {latency['min']:>9.3f} ms  p50 {latency['p50']:>9.3f} ms  "
+          f"p95 {latency['p95']:>9.3f} ms  p99 {latency['p99']:>9.3f} ms  peak {peak_mb:>7} MiB")
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return f"{result['backend']}/{result['size']}/{result['operation']}"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, List[str]]:
+    """
+    Compare results against a baseline.
+
+    Gates on the fastest call, the best round and median peak memory. These
+    measure what the code costs when nothing else interferes, so unlike
+    medians and tail percentiles they barely move between runs of unchanged code.
+
+    Returns:
+        Descriptions of every metric that regressed beyond the threshold, by result key
+    """
+    baseline_results = {result_key(result): result for result in baseline["results"]}
+    regressions: Dict[str, List[str]] = {}
+    for result in current["results"]:
+        key = result_key(result)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+
+        found = []
+        if result["ops_per_sec_best"] < previous["ops_per_sec_best"] * (1 - threshold):
+            found.append(
+                f"{key}: best round ops/sec {previous['ops_per_sec_best']:.1f} -> {result['ops_per_sec_best']:.1f}"
+            )
+        if result["latency_ms"]["min"] > previous["latency_ms"]["min"] * (1 + threshold):
+            found.append(
+                f"{key}: min latency {previous['latency_ms']['min']:.3f} ms -> {result['latency_ms']['min']:.3f} ms"
+            )
+        if (result["peak_memory_bytes"] is not None and previous["peak_memory_bytes"] is not None
+                and result["peak_memory_bytes"] > previous["peak_memory_bytes"] * (1 + threshold)):
+            found.append(
+                f"{key}: peak memory {previous['peak_memory_bytes']} -> {result['peak_memory_bytes']} bytes"
+            )
+        if found:
+            regressions[key] = found
+    return regressions
+
+
+def merge_best(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two measurements of the same case, keeping the best gated metrics."""
+    merged = dict(first, rounds=first["rounds"] + second["rounds"])
+    merged["ops_per_sec_best"] = max(first["ops_per_sec_best"], second["ops_per_sec_best"])
+    merged["latency_ms"] = dict(first["latency_ms"], min=min(first["latency_ms"]["min"], second["latency_ms"]["min"]))
+    if first["peak_memory_bytes"] is not None and second["peak_memory_bytes"] is not None:
+        merged["peak_memory_bytes"] = min(first["peak_memory_bytes"], second["peak_memory_bytes"])
+    return merged
+
+
+def confirm(report: Dict[str, Any], keys: List[str], args: argparse.Namespace) -> None:
+    """Re-run regressed cases and fold the new measurements into the report."""
+    results = report["results"]
+    for index, result in enumerate(results):
+        if result_key(result) not in keys:
+            continue
+        print(f"Re-running {result_key(result)} to confirm")
+        rerun = run([result["size"]], [result["backend"]], [result["operation"]],
+                    args.iterations, args.rounds, not args.no_memory)
+        results[index] = merge_best(result, rerun["results"][0])
+
+
+def write_report(report: Dict[str, Any], path: Optional[Path]) -> None:
+    """Write results JSON if a path was given."""
+    if path is not None:
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Storage-layer microbenchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--iterations", type=int, default=0,
+                        help="iterations per round (default scales with dataset size)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help=f"rounds per operation, each on a fresh dataset copy (default {DEFAULT_ROUNDS})")
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurement")
+    parser.add_argument("--output", type=Path, help="write results JSON to this path")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed relative regression before failing (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--confirm-runs", type=int, default=DEFAULT_CONFIRM_RUNS,
+                        help="re-run regressed cases this many times before reporting them "
+                             f"(default {DEFAULT_CONFIRM_RUNS})")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.backends, args.operations, args.iterations, args.rounds,
+                 not args.no_memory)
+
+    if args.save_baseline:
+        write_report(report, args.output)
+        write_report(report, args.baseline)
+        return 0
+
+    if not args.baseline.exists():
+        write_report(report, args.output)
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, args.threshold)
+    for _ in range(args.confirm_runs):
+        if not regressions:
+            break
+        # A busy machine slows a whole case down; real regressions reproduce
+        confirm(report, list(regressions), args)
+        regressions = compare(report, baseline, args.threshold)
+
+    write_report(report, args.output)
+    if regressions:
+        found = [regression for case in regressions.values() for regression in case]
+        print(f"{len(found)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in found:
+            print(f"  {regression}")
+        return 1
+
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Response compression helpers.
+
+Provides Accept-Encoding negotiation, gzip/brotli encoders and a cache of
+precompressed bodies so identical payloads are only compressed once.
+"""
+import gzip
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from config import settings
+from memory_diagnostics import memory_diagnostics_service
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+# Encodings in server preference order, used to break q-value ties
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def is_compressible_media_type(content_type: Optional[str]) -> bool:
+    """Check whether a Content-Type is worth compressing."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return any(
+        media_type.startswith(prefix) if prefix.endswith("/") else media_type == prefix
+        for prefix in COMPRESSIBLE_MEDIA_TYPES
+    )
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: The raw Accept-Encoding header value
+
+    Returns:
+        The chosen encoding, or None if the body should be sent uncompressed
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, precompressed: bool = False) -> bytes:
+    """
+    Compress a body with the given encoding.
+
+    Args:
+        body: The uncompressed body
+        encoding: Either "gzip" or "br"
+        precompressed: Use the higher levels configured for cached bodies
+
+    Returns:
+        The compressed body
+    """
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("brotli encoding requested but brotli is not installed")
+        quality = (settings.compression_cached_brotli_quality if precompressed
+                   else settings.compression_brotli_quality)
+        return brotli.compress(body, quality=quality)
+    if encoding == "gzip":
+        level = (settings.compression_cached_gzip_level if precompressed
+                 else settings.compression_gzip_level)
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class CompressedBodyCache:
+    """
+    Cache of compressed variants for bodies that only change between versions.
+
+    Entries are keyed by a name (e.g. "users") and tagged with a version; a
+    lookup with a newer version drops every variant built for the old one.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Hashable, int, Dict[str, bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entry[2]) for entry in self._entries.values())
+
+    def get_or_compress(self, name: Hashable, version: Hashable, body: bytes, encoding: str) -> bytes:
+        """
+        Return the cached compressed variant, building it on first use.
+
+        Args:
+            name: Identifies the cacheable resource
+            version: Changes whenever the resource data changes
+            body: The uncompressed body for this version
+            encoding: The negotiated content encoding
+
+        Returns:
+            The compressed body
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version and entry[1] == len(body):
+                cached = entry[2].get(encoding)
+                if cached is not None:
+                    return cached
+
+        compressed = compress(body, encoding, precompressed=True)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != version or entry[1] != len(body):
+                entry = (version, len(body), {})
+                self._entries[name] = entry
+            entry[2][encoding] = compressed
+        return compressed
+
+    def invalidate(self, name: Hashable) -> None:
+        """Drop all cached variants for a resource."""
+        with self._lock:
+            self._entries.pop(name, None)
+
+
+# Global compressed body cache instance
+compressed_body_cache = CompressedBodyCache()
+
+memory_diagnostics_service.register_cache(
+    "compressed_bodies",
+    lambda: (len(compressed_body_cache), compressed_body_cache, {})
+)
@@ -15,10 +15,26 @@ class Settings:
     debug: bool = False
     host: str = "127.0.0.1"
     port: int = 8000
+
+    # Launcher settings
+    workers: Optional[int] = None  # defaults to the CPU count
+    event_loop: str = "auto"  # auto, uvloop or asyncio
+    http_parser: str = "auto"  # auto, httptools or h11
+    backlog: int = 2048
+    timeout_keep_alive: int = 5  # seconds
+    limit_concurrency: Optional[int] = None
+    max_requests: Optional[int] = None  # restart a worker after this many requests
+    max_requests_jitter: int = 0  # random extra requests so workers restart at different times
+    graceful_shutdown_timeout: int = 30  # seconds
+    worker_startup_grace_seconds: int = 10  # failed exits sooner count as startup failures
+    worker_restart_backoff_seconds: float = 0.5  # doubled per consecutive startup failure
+    worker_restart_backoff_max_seconds: int = 30
+    worker_max_startup_failures: int = 5  # stop the launcher after this many in a row
     
     # Security settings
     secret_key: str = "your-secret-key-change-in-production"
     access_token_expire_minutes: int = 30
+    admin_users: list[str] = ["admin"]
     
     # CORS settings
     cors_origins: list[str] = [
@@ -35,6 +51,31 @@ class Settings:
     # Cache settings
     cache_ttl_seconds: int = 300  # 5 minutes
 
+    # Dog image proxy settings
+    dog_image_proxy_enabled: bool = True
+    dog_image_cache_dir: Path = Path(__file__).parent / ".cache" / "dog_images"
+    dog_image_cache_max_bytes: int = 64 * 1024 * 1024  # 64 MiB
+    dog_image_max_fetch_bytes: int = 8 * 1024 * 1024  # 8 MiB
+    dog_image_max_age_seconds: int = 31536000  # 1 year
+    dog_image_prefetch_concurrency: int = 2
+    dog_image_prefetch_max_pending: int = 32
+
+    # Response compression settings
+    compression_enabled: bool = True
+    compression_minimum_size: int = 500  # bytes
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    # Cached bodies are built once per data refresh. Chosen from
+    # `benchmarks/compression_benchmark.py --sweep` on /users-shaped JSON: level 8
+    # is where size stops improving for gzip and where brotli is still ~2 ms for
+    # 1000 users (quality 9+ costs 14-180 ms on the event loop for ~1-6% less).
+    compression_cached_gzip_level: int = 8
+    compression_cached_brotli_quality: int = 8
+
+    # Memory diagnostics settings
+    memory_snapshot_limit: int = 5
+    memory_trace_max_frames: int = 25
+
     # Database Configuration
     DATABASE_DIR: Path = Path(__file__).parent.parent / "database"
     USERS_FILE: Path = DATABASE_DIR / "users.json"
@@ -205,8 +205,13 @@ class JSONDatabaseService(DatabaseInterface):
 class DatabaseServiceFactory:
     """Factory class for creating database services."""
     
+    @staticmethod
+    def create_service(file_path: Path) -> JSONDatabaseService:
+        """Create a database service backed by the given file."""
+        return JSONDatabaseService(file_path)
+    
     @staticmethod
     def create_users_service() -> JSONDatabaseService:
         """Create a users database service."""
-        return JSONDatabaseService(settings.USERS_FILE)
+        return DatabaseServiceFactory.create_service(settings.USERS_FILE)
     
\ No newline at end of file
@@ -0,0 +1,353 @@
+"""
+Content-addressed on-disk image cache.
+
+Images are stored under the SHA-256 of their bytes, so identical images
+share one file and a hash in a URL always refers to the same content.
+Source URLs are mapped to content hashes through small sidecar files, so
+the mapping survives restarts. The directory is the source of truth: every
+process sharing it enforces the same size budget over the files on disk,
+evicting the least recently used images by modification time along with the
+sidecars that pointed at them.
+
+All methods perform blocking file I/O; call them from a worker thread.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Subdirectory holding one "<sha256 of url>" file per source URL
+URL_INDEX_DIR = "urls"
+
+# Sidecars younger than this may belong to an image written after an eviction
+# scan started, so pruning leaves them for the next pass
+_SIDECAR_PRUNE_MIN_AGE_NS = 5_000_000_000
+
+# Leading bytes used to recover the media type of files found on disk
+_MAGIC_MEDIA_TYPES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_media_type(head: bytes) -> str:
+    """Guess an image media type from its leading bytes."""
+    for magic, media_type in _MAGIC_MEDIA_TYPES:
+        if head.startswith(magic):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a temporary name so readers never see partial data."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class CachedImage:
+    """A single image stored in the cache."""
+
+    __slots__ = ("image_hash", "path", "size", "media_type", "source_urls", "touched_at")
+
+    def __init__(self, image_hash: str, path: Path, size: int, media_type: str):
+        self.image_hash = image_hash
+        self.path = path
+        self.size = size
+        self.media_type = media_type
+        self.source_urls: List[str] = []
+        # Monotonic time the file's mtime was last refreshed by this process
+        self.touched_at = 0.0
+
+
+class ImageCache:
+    """Size-bounded, content-addressed image cache with LRU eviction."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, touch_interval: float = 60.0):
+        """
+        Initialize the image cache.
+
+        Args:
+            cache_dir: Directory holding the cached image files
+            max_bytes: Upper bound on the total size of cached images on disk
+            touch_interval: Minimum seconds between mtime refreshes of a hit image
+        """
+        self.cache_dir = cache_dir
+        self.url_index_dir = cache_dir / URL_INDEX_DIR
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._entries: Dict[str, CachedImage] = {}
+        self._url_index: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_existing()
+
+    @staticmethod
+    def is_valid_hash(image_hash: str) -> bool:
+        """Check that a value is a well-formed content hash."""
+        return bool(_HASH_PATTERN.match(image_hash))
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        """File name of the sidecar recording which image a URL resolved to."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the cached images indexed by this instance."""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_existing(self) -> None:
+        """Index images left on disk by a previous process."""
+        try:
+            self.url_index_dir.mkdir(parents=True, exist_ok=True)
+            names = [path.name for path in self.cache_dir.iterdir() if self.is_valid_hash(path.name)]
+        except OSError as e:
+            logger.error(f"Failed to scan image cache {self.cache_dir}: {e}")
+            return
+
+        with self._lock:
+            for name in names:
+                # Files removed by another process since the listing are skipped
+                self._index_file(name)
+        self._evict()
+        logger.info(f"Indexed {len(self._entries)} cached images in {self.cache_dir}")
+
+    def _index_file(self, image_hash: str) -> Optional[CachedImage]:
+        """Add an image file already on disk to the index. Caller holds the lock."""
+        path = self.cache_dir / image_hash
+        try:
+            with open(path, "rb") as file:
+                media_type = sniff_media_type(file.read(16))
+                size = os.fstat(file.fileno()).st_size
+        except OSError:
+            return None
+
+        entry = CachedImage(image_hash, path, size, media_type)
+        self._entries[image_hash] = entry
+        self._total_bytes += size
+        return entry
+
+    def _drop(self, entry: CachedImage) -> None:
+        """Remove an entry from the in-memory index. Caller holds the lock."""
+        if self._entries.pop(entry.image_hash, None) is not None:
+            self._total_bytes -= entry.size
+        for url in entry.source_urls:
+            self._url_index.pop(url, None)
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        """Mark a file as just used. Returns False if it no longer exists."""
+        # Set explicitly: filesystem timestamps are too coarse to order back-to-back writes
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used images until the directory fits its budget.
+
+        Scans the directory rather than the in-memory index, so images stored by
+        other processes count against the budget too, then prunes sidecars whose
+        image is gone. Only updating the in-memory index takes the lock.
+        """
+        scan_started_ns = time.time_ns()
+        files = []
+        total = 0
+        try:
+            paths = list(self.cache_dir.iterdir())
+        except OSError as e:
+            logger.error(f"Failed to scan image cache {self.cache_dir}: {e}")
+            return
+        for path in paths:
+            if not self.is_valid_hash(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, path.name, stat.st_size))
+            total += stat.st_size
+
+        files.sort()
+        live = {image_hash for _, image_hash, _ in files}
+        evicted = []
+        for _, image_hash, size in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.cache_dir / image_hash).unlink()
+            except FileNotFoundError:
+                # Another process evicted it first
+                pass
+            except OSError as e:
+                logger.error(f"Failed to evict cached image {image_hash}: {e}")
+                continue
+            total -= size
+            live.discard(image_hash)
+            evicted.append(image_hash)
+
+        with self._lock:
+            for image_hash in evicted:
+                entry = self._entries.get(image_hash)
+                if entry is not None:
+                    self._drop(entry)
+        self._prune_url_index(live, scan_started_ns - _SIDECAR_PRUNE_MIN_AGE_NS)
+
+    def _prune_url_index(self, live: Set[str], older_than_ns: int) -> None:
+        """Delete sidecars last written before ``older_than_ns`` that point at no live image."""
+        try:
+            paths = list(self.url_index_dir.iterdir())
+        except OSError as e:
+            logger.error(f"Failed to scan image cache URL index {self.url_index_dir}: {e}")
+            return
+        for path in paths:
+            if not self.is_valid_hash(path.name):
+                # Temporary files of in-progress writes
+                continue
+            try:
+                if path.stat().st_mtime_ns >= older_than_ns:
+                    continue
+                if path.read_text(encoding="ascii").strip() in live:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error(f"Failed to prune cached image URL {path}: {e}")
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        """Return the content hash of a cached source URL, if any."""
+        with self._lock:
+            image_hash = self._url_index.get(url)
+
+        if image_hash is None:
+            try:
+                image_hash = (self.url_index_dir / self.url_key(url)).read_text(encoding="ascii").strip()
+            except (OSError, UnicodeDecodeError):
+                return None
+
+        entry = self.get(image_hash)
+        if entry is None:
+            # The image was evicted; the sidecar no longer points anywhere
+            try:
+                (self.url_index_dir / self.url_key(url)).unlink()
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            if url not in entry.source_urls:
+                entry.source_urls.append(url)
+            self._url_index[url] = image_hash
+        return image_hash
+
+    def get(self, image_hash: str) -> Optional[CachedImage]:
+        """
+        Look up a cached image by content hash.
+
+        Images written to the cache directory by another process are indexed
+        on first access, and images evicted by another process are forgotten.
+        Hits refresh the file's mtime at most once per ``touch_interval``.
+
+        Returns:
+            The cached image, or None if it is not in the cache
+        """
+        if not self.is_valid_hash(image_hash):
+            return None
+        with self._lock:
+            entry = self._entries.get(image_hash)
+            if entry is None:
+                entry = self._index_file(image_hash)
+                if entry is None:
+                    return None
+
+            now = time.monotonic()
+            if now - entry.touched_at >= self.touch_interval:
+                exists = self._touch(entry.path)
+                entry.touched_at = now
+            else:
+                exists = entry.path.exists()
+            if not exists:
+                self._drop(entry)
+                return None
+            return entry
+
+    def discard(self, image_hash: str) -> None:
+        """Forget an image whose file has disappeared from disk."""
+        with self._lock:
+            entry = self._entries.get(image_hash)
+            if entry is not None:
+                self._drop(entry)
+
+    def put(self, url: str, data: bytes) -> Optional[str]:
+        """
+        Store image bytes fetched from a source URL.
+
+        Args:
+            url: The URL the image was fetched from
+            data: The raw image bytes
+
+        Returns:
+            The content hash, or None if the image cannot be cached
+        """
+        if not data or len(data) > self.max_bytes:
+            return None
+
+        image_hash = hashlib.sha256(data).hexdigest()
+        path = self.cache_dir / image_hash
+        try:
+            self.url_index_dir.mkdir(parents=True, exist_ok=True)
+            if not self._touch(path):
+                _write_atomic(path, data)
+                self._touch(path)
+            _write_atomic(self.url_index_dir / self.url_key(url), image_hash.encode("ascii"))
+        except OSError as e:
+            logger.error(f"Failed to write cached image {path}: {e}")
+            return None
+
+        with self._lock:
+            entry = self._entries.get(image_hash)
+            if entry is None:
+                entry = CachedImage(image_hash, path, len(data), sniff_media_type(data[:16]))
+                self._entries[image_hash] = entry
+                self._total_bytes += entry.size
+            entry.touched_at = time.monotonic()
+            if url not in entry.source_urls:
+                entry.source_urls.append(url)
+            self._url_index[url] = image_hash
+
+        self._evict()
+        with self._lock:
+            return image_hash if image_hash in self._entries else None
+
+
+# Global dog image cache instance
+dog_image_cache = ImageCache(settings.dog_image_cache_dir, settings.dog_image_cache_max_bytes)
@@ -0,0 +1,211 @@
+"""
+Production launcher.
+Runs the application under a pre-fork worker supervisor configured from Settings.
+"""
+import importlib.util
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional
+
+import uvicorn
+
+from config import settings
+
+APP_IMPORT_STRING = "main:app"
+
+logger = logging.getLogger("uvicorn.error")
+
+# Spawned workers start from a clean interpreter, as uvicorn's own supervisor does
+spawn = multiprocessing.get_context("spawn")
+
+
+def resolve_event_loop() -> str:
+    """Pick the event loop implementation, preferring uvloop when installed."""
+    if settings.event_loop != "auto":
+        return settings.event_loop
+    return "uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio"
+
+
+def resolve_http_parser() -> str:
+    """Pick the HTTP parser implementation, preferring httptools when installed."""
+    if settings.http_parser != "auto":
+        return settings.http_parser
+    return "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+
+
+def resolve_workers() -> int:
+    """Number of worker processes, defaulting to the CPU count."""
+    return settings.workers or os.cpu_count() or 1
+
+
+def build_config() -> uvicorn.Config:
+    """Build the uvicorn configuration shared by all workers."""
+    return uvicorn.Config(
+        APP_IMPORT_STRING,
+        host=settings.host,
+        port=settings.port,
+        loop=resolve_event_loop(),
+        http=resolve_http_parser(),
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.timeout_keep_alive,
+        limit_concurrency=settings.limit_concurrency,
+        limit_max_requests=settings.max_requests,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+    )
+
+
+def run_worker(config: uvicorn.Config, sockets: List[socket.socket]) -> None:
+    """Worker process entry point: serve on the inherited sockets until told to stop."""
+    if config.limit_max_requests and settings.max_requests_jitter:
+        # Stagger restarts so workers do not all recycle at the same moment
+        config.limit_max_requests += random.randint(0, settings.max_requests_jitter)
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+class WorkerSupervisor:
+    """
+    Pre-fork supervisor that keeps a fixed number of workers alive.
+
+    The listening socket is bound once and shared by every worker. Workers
+    that exit on their own, e.g. after reaching ``max_requests``, are replaced
+    while the rest keep serving, giving rolling restarts. Workers that fail
+    during startup are restarted with exponential backoff per slot, and the
+    supervisor gives up once a slot keeps failing.
+    """
+
+    poll_interval = 0.5  # seconds
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = workers
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self.should_exit = threading.Event()
+        self.exit_code = 0
+        self._sockets: List[socket.socket] = []
+        self._started_at = [0.0] * workers
+        self._restart_at = [0.0] * workers
+        # Consecutive startup failures per worker slot
+        self._startup_failures = [0] * workers
+
+    def _spawn_worker(self) -> multiprocessing.Process:
+        process = spawn.Process(target=run_worker, args=(self.config, self._sockets))
+        process.start()
+        return process
+
+    def _handle_exit(self, sig: int, frame) -> None:
+        self.should_exit.set()
+
+    def _restart_delay(self, index: int, lifetime: float, exitcode: Optional[int]) -> float:
+        """
+        Seconds to wait before replacing the worker in slot ``index``.
+
+        Only a worker that failed before getting through startup counts as a
+        startup failure; clean exits, e.g. on reaching ``max_requests``, are
+        replaced straight away however short-lived they were.
+        """
+        if exitcode == 0 or lifetime >= settings.worker_startup_grace_seconds:
+            self._startup_failures[index] = 0
+            return 0.0
+
+        self._startup_failures[index] += 1
+        return min(
+            settings.worker_restart_backoff_seconds * 2 ** (self._startup_failures[index] - 1),
+            settings.worker_restart_backoff_max_seconds,
+        )
+
+    def _check_workers(self) -> None:
+        """Replace exited workers, applying backoff to ones that died at startup."""
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process is not None and process.is_alive():
+                if now - self._started_at[index] >= settings.worker_startup_grace_seconds:
+                    # This slot's worker made it through startup
+                    self._startup_failures[index] = 0
+                continue
+
+            if process is not None:
+                self.processes[index] = None
+                lifetime = now - self._started_at[index]
+                delay = self._restart_delay(index, lifetime, process.exitcode)
+                if self._startup_failures[index] >= settings.worker_max_startup_failures:
+                    logger.error(
+                        f"Worker {process.pid} exited with code {process.exitcode} during startup; "
+                        f"{self._startup_failures[index]} consecutive startup failures, giving up"
+                    )
+                    self.exit_code = 1
+                    self.should_exit.set()
+                    return
+                logger.info(
+                    f"Worker {process.pid} exited with code {process.exitcode} after {lifetime:.1f}s; "
+                    f"restarting in {delay:.1f}s"
+                )
+                self._restart_at[index] = now + delay
+
+            if now >= self._restart_at[index]:
+                self.processes[index] = self._spawn_worker()
+                self._started_at[index] = now
+
+    def run(self) -> int:
+        """
+        Bind the socket, start the workers and supervise until shutdown.
+
+        Returns:
+            The process exit code
+        """
+        self._sockets = [self.config.bind_socket()]
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._handle_exit)
+
+        logger.info(
+            f"Starting {self.workers} workers (loop={self.config.loop}, http={self.config.http}, "
+            f"max_requests={self.config.limit_max_requests})"
+        )
+
+        try:
+            self._check_workers()
+            while not self.should_exit.wait(self.poll_interval):
+                self._check_workers()
+        finally:
+            self.shutdown()
+        return self.exit_code
+
+    def shutdown(self) -> None:
+        """Ask workers to finish in-flight requests, then force any stragglers."""
+        processes = [process for process in self.processes if process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        timeout: Optional[float] = self.config.timeout_graceful_shutdown
+        for process in processes:
+            process.join(None if timeout is None else timeout + 5)
+            if process.is_alive():
+                logger.warning(f"Worker {process.pid} did not stop in time; killing it")
+                process.kill()
+                process.join()
+
+        for sock in self._sockets:
+            sock.close()
+        logger.info("All workers stopped")
+
+
+def main() -> None:
+    """Launch the server as configured in Settings."""
+    if settings.debug:
+        # Auto-reload manages its own single process
+        uvicorn.run(APP_IMPORT_STRING, host=settings.host, port=settings.port, reload=True)
+        return
+
+    sys.exit(WorkerSupervisor(build_config(), resolve_workers()).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ Refactored to follow SOLID principles and best practices.
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from config import settings
-from middleware import setup_cors_middleware, setup_logging_middleware
-from routers import auth_router, users_router, content_router, health_router
+from middleware import (
+    setup_compression_middleware, setup_cors_middleware, setup_logging_middleware
+)
+from services import dog_image_service
+from routers import auth_router, users_router, content_router, admin_router, health_router
 
 
 def create_app() -> FastAPI:
@@ -19,6 +22,7 @@ def create_app() -> FastAPI:
     )
     
     # Setup middleware
+    setup_compression_middleware(app)
     setup_cors_middleware(app)
     setup_logging_middleware(app)
     
@@ -27,6 +31,10 @@ def create_app() -> FastAPI:
     app.include_router(auth_router)
     app.include_router(users_router)
     app.include_router(content_router)
+    app.include_router(admin_router)
+    
+    # Release shared HTTP sessions on shutdown
+    app.add_event_handler("shutdown", dog_image_service.close)
     
     # Global exception handler
     @app.exception_handler(Exception)
@@ -44,13 +52,8 @@ app = create_app()
 
 
 if __name__ == "__main__":
-    import uvicorn
+    from launcher import main
     
-    uvicorn.run(
-        "main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug
-    )
+    main()
 
 
@@ -0,0 +1,242 @@
+"""
+Memory diagnostics.
+
+Wraps tracemalloc snapshots and reports approximate sizes of in-process
+caches and garbage collector statistics. Tracing is only started on demand,
+so nothing is recorded or retained while it is off.
+
+All state is per process: with several workers, each request reaches one of
+them, and the reported pid says which.
+"""
+import gc
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+
+from config import settings
+from models import (
+    AllocationReport, AllocationSite, CacheStats, GCGenerationStats,
+    MemoryReport, SnapshotInfo, TracingStatus
+)
+
+# Objects shared process-wide; following them would size the whole interpreter
+_SIZEOF_SKIP_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.FrameType, types.CodeType, types.CoroutineType,
+)
+
+# Allocations made by the diagnostics machinery itself
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+GROUP_BY_OPTIONS = ("lineno", "filename", "traceback")
+
+# Returns (entry count, object to measure, extra details) for a cache
+CacheProbe = Callable[[], Tuple[int, Any, Dict[str, Any]]]
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximate the memory retained by an object graph.
+
+    Follows references with gc.get_referents, counting each object once and
+    skipping classes, modules and functions shared by the whole process.
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending:
+        current = pending.pop()
+        if isinstance(current, _SIZEOF_SKIP_TYPES) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return total
+
+
+class MemoryDiagnosticsService:
+    """Service for tracemalloc snapshots and cache sizing."""
+
+    def __init__(self):
+        self._snapshots: "OrderedDict[int, Tuple[SnapshotInfo, tracemalloc.Snapshot]]" = OrderedDict()
+        self._snapshot_ids = itertools.count(1)
+        self._caches: Dict[str, CacheProbe] = {}
+        # Snapshot endpoints run in the threadpool
+        self._lock = threading.Lock()
+
+    def register_cache(self, name: str, probe: CacheProbe) -> None:
+        """Register a cache to include in memory reports."""
+        self._caches[name] = probe
+
+    def start_tracing(self, frames: int = 1) -> TracingStatus:
+        """Start tracing allocations, keeping up to ``frames`` frames per trace."""
+        frames = max(1, min(frames, settings.memory_trace_max_frames))
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        return self.get_tracing_status()
+
+    def stop_tracing(self) -> TracingStatus:
+        """Stop tracing and drop all stored snapshots."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+        return self.get_tracing_status()
+
+    def get_tracing_status(self) -> TracingStatus:
+        """Return the current tracing state."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return TracingStatus(
+            pid=os.getpid(),
+            tracing=tracing,
+            frames=tracemalloc.get_traceback_limit() if tracing else 0,
+            current_bytes=current,
+            peak_bytes=peak,
+            snapshots=[info for info, _ in list(self._snapshots.values())],
+        )
+
+    def take_snapshot(self) -> SnapshotInfo:
+        """
+        Take and store a snapshot, evicting the oldest beyond the limit.
+        Raises HTTPException if tracing is not active.
+        """
+        if not tracemalloc.is_tracing():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Memory tracing is not active in worker {os.getpid()}"
+            )
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        info = SnapshotInfo(
+            id=next(self._snapshot_ids),
+            taken_at=time.time(),
+            traced_bytes=sum(trace.size for trace in snapshot.traces),
+        )
+        with self._lock:
+            self._snapshots[info.id] = (info, snapshot)
+            while len(self._snapshots) > settings.memory_snapshot_limit:
+                self._snapshots.popitem(last=False)
+        return info
+
+    def _get_snapshot(self, snapshot_id: int) -> Tuple[SnapshotInfo, tracemalloc.Snapshot]:
+        """Look up a stored snapshot or raise a 404."""
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Snapshot {snapshot_id} not found in worker {os.getpid()}"
+            )
+        return entry
+
+    @staticmethod
+    def _validate_group_by(group_by: str) -> None:
+        if group_by not in GROUP_BY_OPTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}"
+            )
+
+    @staticmethod
+    def _format_location(traceback: tracemalloc.Traceback, group_by: str) -> str:
+        if group_by == "filename":
+            return traceback[0].filename
+        # Frames are ordered oldest call first
+        return " -> ".join(f"{frame.filename}:{frame.lineno}" for frame in traceback)
+
+    def top_allocations(self, snapshot_id: int, limit: int = 20,
+                        group_by: str = "lineno") -> AllocationReport:
+        """Return the largest allocation sites in a snapshot."""
+        self._validate_group_by(group_by)
+        info, snapshot = self._get_snapshot(snapshot_id)
+        stats = snapshot.statistics(group_by)[:limit]
+        return AllocationReport(
+            snapshots=[info],
+            group_by=group_by,
+            items=[
+                AllocationSite(
+                    location=self._format_location(stat.traceback, group_by),
+                    size_bytes=stat.size,
+                    count=stat.count,
+                )
+                for stat in stats
+            ],
+        )
+
+    def diff_snapshots(self, old_id: int, new_id: int, limit: int = 20,
+                       group_by: str = "lineno") -> AllocationReport:
+        """Return the allocation sites that changed most between two snapshots."""
+        self._validate_group_by(group_by)
+        old_info, old_snapshot = self._get_snapshot(old_id)
+        new_info, new_snapshot = self._get_snapshot(new_id)
+        stats = new_snapshot.compare_to(old_snapshot, group_by)[:limit]
+        return AllocationReport(
+            snapshots=[old_info, new_info],
+            group_by=group_by,
+            items=[
+                AllocationSite(
+                    location=self._format_location(stat.traceback, group_by),
+                    size_bytes=stat.size,
+                    count=stat.count,
+                    size_diff_bytes=stat.size_diff,
+                    count_diff=stat.count_diff,
+                )
+                for stat in stats
+            ],
+        )
+
+    def get_cache_stats(self) -> List[CacheStats]:
+        """Return the approximate size of every registered cache."""
+        results = []
+        for name, probe in self._caches.items():
+            entries, target, extra = probe()
+            results.append(CacheStats(
+                name=name,
+                entries=entries,
+                approx_bytes=deep_sizeof(target),
+                extra=extra,
+            ))
+        return results
+
+    @staticmethod
+    def get_gc_stats() -> List[GCGenerationStats]:
+        """Return per-generation garbage collector statistics."""
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        return [
+            GCGenerationStats(
+                generation=generation,
+                collections=stats["collections"],
+                collected=stats["collected"],
+                uncollectable=stats["uncollectable"],
+                pending=counts[generation],
+                threshold=thresholds[generation],
+            )
+            for generation, stats in enumerate(gc.get_stats())
+        ]
+
+    def get_report(self) -> MemoryReport:
+        """Return tracing status, cache sizes and GC statistics."""
+        return MemoryReport(
+            tracing=self.get_tracing_status(),
+            caches=self.get_cache_stats(),
+            gc=self.get_gc_stats(),
+        )
+
+
+# Global memory diagnostics service instance
+memory_diagnostics_service = MemoryDiagnosticsService()
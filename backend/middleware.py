@@ -3,32 +3,134 @@ Custom middleware for the application.
 Handles CORS, logging, and other cross-cutting concerns.
 """
 import time
-from fastapi import Request, Response
+from fastapi import Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from config import settings
+from compression import (
+    compress, compressed_body_cache, is_compressible_media_type, negotiate_encoding
+)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests."""
+class LoggingMiddleware:
+    """
+    Middleware for logging HTTP requests.
     
-    async def dispatch(self, request: Request, call_next):
+    Implemented as plain ASGI so response messages, including zero-copy
+    file sends on servers that support them, pass through untouched.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         start_time = time.time()
         
         # Log request
+        request = Request(scope)
         print(f"Request: {request.method} {request.url}")
         
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Log response
+                process_time = time.time() - start_time
+                print(f"Response: {message['status']} - {process_time:.4f}s")
+                
+                # Add timing header
+                MutableHeaders(scope=message).append("X-Process-Time", str(process_time))
+            await send(message)
+        
         # Process request
-        response = await call_next(request)
+        await self.app(scope, receive, send_with_timing)
+
+
+class CompressionMiddleware:
+    """
+    Middleware for gzip/brotli response compression.
+    
+    Routes whose body only changes between data refreshes can set
+    ``request.state.compression_cache_key`` to a ``(name, version)`` tuple;
+    their compressed variants are then built once and reused. Responses that
+    are not compressed are streamed through unchanged.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log response
-        process_time = time.time() - start_time
-        print(f"Response: {response.status_code} - {process_time:.4f}s")
+        # Shared with the endpoint's request.state
+        state = scope.setdefault("state", {})
+        encoding = None
+        if scope["method"] != "HEAD":
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        chunks = []
         
-        # Add timing header
-        response.headers["X-Process-Time"] = str(process_time)
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                status_code = message["status"]
+                if (status_code < 200 or status_code in (204, 304)
+                        or "content-encoding" in headers
+                        or not is_compressible_media_type(headers.get("content-type"))):
+                    await send(message)
+                    return
+                
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                
+                # Hold the headers back until the body is known
+                start_message = message
+                return
+            
+            if start_message is None:
+                await send(message)
+                return
+            
+            if message["type"] != "http.response.body":
+                # Not a plain body; give up on compression and forward as-is
+                await send(start_message)
+                start_message = None
+                for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunks.clear()
+                await send(message)
+                return
+            
+            # Buffer the body; compressible responses here are small JSON/text payloads
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start_message)
+            if len(body) >= settings.compression_minimum_size:
+                cache_key = state.get("compression_cache_key")
+                if cache_key is not None:
+                    name, version = cache_key
+                    body = compressed_body_cache.get_or_compress(name, version, body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
         
-        return response
+        await self.app(scope, receive, send_compressed)
 
 
 def setup_cors_middleware(app):
@@ -45,3 +147,9 @@ def setup_cors_middleware(app):
 def setup_logging_middleware(app):
     """Setup logging middleware."""
     app.add_middleware(LoggingMiddleware)
+
+
+def setup_compression_middleware(app):
+    """Setup response compression middleware if enabled."""
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
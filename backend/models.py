@@ -51,3 +51,61 @@ class ErrorResponse(BaseModel):
     """Error response model."""
     detail: str
     error_code: Optional[str] = None
+
+
+class AllocationSite(BaseModel):
+    """Memory allocated from a single source location."""
+    location: str
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = None
+    count_diff: Optional[int] = None
+
+
+class SnapshotInfo(BaseModel):
+    """Metadata about a stored tracemalloc snapshot."""
+    id: int
+    taken_at: float
+    traced_bytes: int
+
+
+class AllocationReport(BaseModel):
+    """Top allocation sites for a snapshot or a snapshot diff."""
+    snapshots: List[SnapshotInfo]
+    group_by: str
+    items: List[AllocationSite]
+
+
+class TracingStatus(BaseModel):
+    """Current tracemalloc state of the worker process that served the request."""
+    pid: int
+    tracing: bool
+    frames: int
+    current_bytes: int
+    peak_bytes: int
+    snapshots: List[SnapshotInfo]
+
+
+class CacheStats(BaseModel):
+    """Approximate size of an in-process cache."""
+    name: str
+    entries: int
+    approx_bytes: int
+    extra: dict = {}
+
+
+class GCGenerationStats(BaseModel):
+    """Garbage collector statistics for one generation."""
+    generation: int
+    collections: int
+    collected: int
+    uncollectable: int
+    pending: int
+    threshold: int
+
+
+class MemoryReport(BaseModel):
+    """Memory diagnostics summary."""
+    tracing: TracingStatus
+    caches: List[CacheStats]
+    gc: List[GCGenerationStats]
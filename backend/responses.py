@@ -0,0 +1,47 @@
+"""
+Custom response classes.
+Extends Starlette responses with transport-level optimizations.
+"""
+import os
+from fastapi.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+ZEROCOPY_SEND_EXTENSION = "http.response.zerocopysend"
+
+
+class SendfileResponse(FileResponse):
+    """
+    File response that can hand the file descriptor to the server for sendfile.
+
+    Uses the ASGI zero-copy send extension when the server advertises it,
+    so the kernel copies the file straight to the socket. uvicorn does not
+    implement the extension, so under the launcher this always falls back
+    to the regular chunked FileResponse reads.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        if ZEROCOPY_SEND_EXTENSION not in extensions or scope["method"].upper() == "HEAD":
+            await super().__call__(scope, receive, send)
+            return
+
+        if self.stat_result is None:
+            self.stat_result = os.stat(self.path)
+            self.set_stat_headers(self.stat_result)
+
+        with open(self.path, "rb") as file:
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            await send({
+                "type": ZEROCOPY_SEND_EXTENSION,
+                "file": file,
+                "count": self.stat_result.st_size,
+                "more_body": False,
+            })
+
+        if self.background is not None:
+            await self.background()
@@ -2,19 +2,25 @@
 API route handlers.
 Contains route definitions separated by domain/feature.
 """
-from fastapi import APIRouter, Request, Depends, HTTPException, status
+import os
+from fastapi import APIRouter, Request, Depends, HTTPException, Query, status
 from models import (
     LoginRequest, LoginResponse, UsersResponse, 
-    DogResponse, SecretDataResponse, ErrorResponse
+    DogResponse, SecretDataResponse, ErrorResponse,
+    AllocationReport, MemoryReport, SnapshotInfo, TracingStatus
 )
 from auth import auth_service
-from services import user_service, secret_data_service, ExternalAPIService
+from services import user_service, secret_data_service, dog_image_service, ExternalAPIService
+from memory_diagnostics import memory_diagnostics_service
+from responses import SendfileResponse
+from config import settings
 
 
 # Create router instances
 auth_router = APIRouter(prefix="/auth", tags=["authentication"])
 users_router = APIRouter(prefix="/users", tags=["users"])
 content_router = APIRouter(prefix="/content", tags=["content"])
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @auth_router.post("/login", response_model=LoginResponse)
@@ -48,6 +54,9 @@ async def get_users(request: Request):
         users = await user_service.get_users()
         simplified_users = user_service.get_simplified_users(users)
         
+        # Body only changes on cache refresh, so compressed variants can be reused
+        request.state.compression_cache_key = ("users", user_service.cache_version)
+        
         return UsersResponse(
             items=simplified_users,
             count=len(simplified_users)
@@ -65,14 +74,15 @@ async def get_users(request: Request):
 
 
 @content_router.get("/dog", response_model=DogResponse)
-async def get_random_dog():
+async def get_random_dog(request: Request):
     """
     Get a random dog image from external API.
+    Images already in the local cache are returned as proxy URLs.
     This endpoint is public (no authentication required).
     """
     try:
         async with ExternalAPIService() as api_service:
-            return await api_service.fetch_random_dog()
+            return await api_service.fetch_random_dog(proxy_base_url=str(request.base_url))
     
     except Exception as e:
         # Return fallback response for any errors
@@ -83,6 +93,36 @@ async def get_random_dog():
         )
 
 
+@content_router.get("/dog/image/{image_hash}", response_class=SendfileResponse)
+def get_dog_image(image_hash: str):
+    """
+    Serve a cached dog image by content hash.
+    Content-addressed URLs never change, so responses are cached as immutable.
+    Cache lookups do file I/O, so this runs in the threadpool, not on the event loop.
+    This endpoint is public (no authentication required).
+    """
+    image = dog_image_service.get_cached_image(image_hash)
+    
+    try:
+        stat_result = os.stat(image.path)
+    except FileNotFoundError:
+        dog_image_service.cache.discard(image_hash)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    
+    return SendfileResponse(
+        image.path,
+        media_type=image.media_type,
+        stat_result=stat_result,
+        headers={
+            "Cache-Control": f"public, max-age={settings.dog_image_max_age_seconds}, immutable",
+            "ETag": f'"{image.image_hash}"',
+        },
+    )
+
+
 @content_router.get("/secret-data", response_model=SecretDataResponse)
 async def get_secret_data(request: Request):
     """
@@ -95,6 +135,84 @@ async def get_secret_data(request: Request):
     return secret_data_service.get_secret_data()
 
 
+@admin_router.get("/memory", response_model=MemoryReport)
+def get_memory_report(request: Request):
+    """
+    Get tracing status, approximate cache sizes and GC statistics.
+    Sizing walks object graphs, so this runs in the threadpool, not on the event loop.
+    Requires admin authentication.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.get_report()
+
+
+@admin_router.post("/memory/tracing/start", response_model=TracingStatus)
+async def start_memory_tracing(request: Request, frames: int = Query(1, ge=1)):
+    """
+    Start tracemalloc, storing up to `frames` stack frames per allocation.
+    Requires admin authentication.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.start_tracing(frames)
+
+
+@admin_router.post("/memory/tracing/stop", response_model=TracingStatus)
+async def stop_memory_tracing(request: Request):
+    """
+    Stop tracemalloc and discard stored snapshots.
+    Requires admin authentication.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.stop_tracing()
+
+
+@admin_router.post("/memory/snapshots", response_model=SnapshotInfo)
+def take_memory_snapshot(request: Request):
+    """
+    Take a tracemalloc snapshot.
+    Requires admin authentication and active tracing.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.take_snapshot()
+
+
+@admin_router.get("/memory/snapshots/{snapshot_id}", response_model=AllocationReport)
+def get_top_allocations(
+    request: Request,
+    snapshot_id: int,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = "lineno",
+):
+    """
+    Get the top allocation sites of a snapshot.
+    Requires admin authentication.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.top_allocations(snapshot_id, limit, group_by)
+
+
+@admin_router.get("/memory/snapshots/{old_id}/diff/{new_id}", response_model=AllocationReport)
+def diff_memory_snapshots(
+    request: Request,
+    old_id: int,
+    new_id: int,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = "lineno",
+):
+    """
+    Get the allocation sites that changed most between two snapshots.
+    Requires admin authentication.
+    """
+    auth_service.require_admin(request)
+    
+    return memory_diagnostics_service.diff_snapshots(old_id, new_id, limit, group_by)
+
+
 # Health check endpoint
 health_router = APIRouter(tags=["health"])
 
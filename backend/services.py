@@ -3,11 +3,16 @@ Business logic services.
 Contains the core business logic separated from route handlers.
 """
 import asyncio
+import logging
 from typing import List, Optional
 import aiohttp
 from fastapi import HTTPException, status
 from models import User, DogResponse, SecretDataResponse
 from config import settings
+from image_cache import ImageCache, CachedImage, dog_image_cache
+from memory_diagnostics import memory_diagnostics_service
+
+logger = logging.getLogger(__name__)
 
 
 class ExternalAPIService:
@@ -54,8 +59,14 @@ class ExternalAPIService:
                 detail=f"Failed to fetch users: {str(e)}"
             )
     
-    async def fetch_random_dog(self) -> DogResponse:
-        """Fetch a random dog image from Dog CEO API."""
+    async def fetch_random_dog(self, proxy_base_url: Optional[str] = None) -> DogResponse:
+        """
+        Fetch a random dog image from Dog CEO API.
+
+        When a proxy base URL is given and the image is already in the local
+        image cache, the returned URL points at the proxy route instead.
+        Uncached images are returned as-is and warmed in the background.
+        """
         if not self.session:
             raise RuntimeError("Service not properly initialized")
         
@@ -78,6 +89,9 @@ class ExternalAPIService:
                         error="missing-image"
                     )
                 
+                if proxy_base_url is not None:
+                    image_url = await dog_image_service.resolve_image_url(image_url, proxy_base_url)
+                
                 return DogResponse(
                     image=image_url,
                     status=data.get("status", "ok")
@@ -89,6 +103,26 @@ class ExternalAPIService:
                 status="error",
                 error=str(e)
             )
+    
+    async def fetch_image(self, image_url: str) -> Optional[bytes]:
+        """Download raw image bytes, returning None on any failure."""
+        if not self.session:
+            raise RuntimeError("Service not properly initialized")
+        
+        try:
+            async with self.session.get(image_url, headers={"Accept": "image/*"}) as response:
+                if response.status != 200:
+                    return None
+                if (response.content_length or 0) > settings.dog_image_max_fetch_bytes:
+                    return None
+                
+                data = await response.read()
+                if len(data) > settings.dog_image_max_fetch_bytes:
+                    return None
+                return data
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
 
 
 class UserService:
@@ -97,6 +131,17 @@ class UserService:
     def __init__(self):
         self._users_cache: List[User] = []
         self._cache_timestamp: Optional[float] = None
+        self._cache_version: int = 0
+    
+    @property
+    def cache_version(self) -> int:
+        """Version of the users cache, bumped on every refresh."""
+        return self._cache_version
+    
+    @property
+    def cached_users(self) -> List[User]:
+        """Users currently held in the cache."""
+        return self._users_cache
     
     async def get_users(self) -> List[User]:
         """
@@ -116,6 +161,7 @@ class UserService:
             users = await api_service.fetch_users()
             self._users_cache = users
             self._cache_timestamp = time.time()
+            self._cache_version += 1
             return users
     
     def get_simplified_users(self, users: List[User]) -> List[dict]:
@@ -130,12 +176,109 @@ class UserService:
         ]
 
 
+class DogImageService:
+    """Service for proxying dog images through the local image cache."""
+    
+    def __init__(self, cache: ImageCache):
+        self.cache = cache
+        self._pending_urls: set[str] = set()
+        self._prefetch_tasks: set[asyncio.Task] = set()
+        self._prefetch_slots = asyncio.Semaphore(settings.dog_image_prefetch_concurrency)
+        self._api_service: Optional[ExternalAPIService] = None
+    
+    @staticmethod
+    def build_proxy_url(base_url: str, image_hash: str) -> str:
+        """Build the proxy route URL for a cached image."""
+        return f"{base_url.rstrip('/')}/content/dog/image/{image_hash}"
+    
+    async def resolve_image_url(self, image_url: str, base_url: str) -> str:
+        """
+        Return a proxied URL for cached images, otherwise the original URL.
+        Cache misses schedule a background download so later views hit.
+        """
+        if not settings.dog_image_proxy_enabled:
+            return image_url
+        
+        image_hash = await asyncio.to_thread(self.cache.lookup_url, image_url)
+        if image_hash is not None:
+            return self.build_proxy_url(base_url, image_hash)
+        
+        self.schedule_prefetch(image_url)
+        return image_url
+    
+    def schedule_prefetch(self, image_url: str) -> None:
+        """
+        Start downloading an image into the cache.
+        Skipped if the URL is already pending or the prefetch queue is full.
+        """
+        if (image_url in self._pending_urls
+                or len(self._pending_urls) >= settings.dog_image_prefetch_max_pending):
+            return
+        
+        self._pending_urls.add(image_url)
+        task = asyncio.create_task(self._prefetch(image_url))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+    
+    async def _get_api_service(self) -> ExternalAPIService:
+        """Return the API service shared by all prefetches, opening it on first use."""
+        if self._api_service is None:
+            self._api_service = await ExternalAPIService().__aenter__()
+        return self._api_service
+    
+    async def _prefetch(self, image_url: str) -> Optional[str]:
+        """Download an image and store it in the cache."""
+        try:
+            async with self._prefetch_slots:
+                api_service = await self._get_api_service()
+                data = await api_service.fetch_image(image_url)
+                if data is None:
+                    return None
+                return await asyncio.to_thread(self.cache.put, image_url, data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to prefetch dog image {image_url}: {e}")
+            return None
+        finally:
+            self._pending_urls.discard(image_url)
+    
+    async def close(self) -> None:
+        """Cancel pending prefetches and close the shared HTTP session."""
+        for task in list(self._prefetch_tasks):
+            task.cancel()
+        await asyncio.gather(*self._prefetch_tasks, return_exceptions=True)
+        
+        if self._api_service is not None:
+            await self._api_service.__aexit__(None, None, None)
+            self._api_service = None
+    
+    def get_cached_image(self, image_hash: str) -> CachedImage:
+        """
+        Get a cached image by content hash.
+        Performs blocking file I/O; call it from a worker thread.
+        Raises HTTPException if the image is not cached.
+        """
+        entry = self.cache.get(image_hash)
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Image not found"
+            )
+        return entry
+
+
 class SecretDataService:
     """Service for secret data operations."""
     
     def __init__(self):
         self._last_login_user: Optional[str] = None
     
+    @property
+    def last_login_user(self) -> Optional[str]:
+        """The last logged in user."""
+        return self._last_login_user
+    
     def set_last_login_user(self, username: str) -> None:
         """Set the last logged in user."""
         self._last_login_user = username
@@ -151,3 +294,21 @@ class SecretDataService:
 # Global service instances
 user_service = UserService()
 secret_data_service = SecretDataService()
+dog_image_service = DogImageService(dog_image_cache)
+
+memory_diagnostics_service.register_cache(
+    "users",
+    lambda: (len(user_service.cached_users), user_service, {"version": user_service.cache_version})
+)
+memory_diagnostics_service.register_cache(
+    "secret_data",
+    lambda: (int(secret_data_service.last_login_user is not None), secret_data_service, {})
+)
+memory_diagnostics_service.register_cache(
+    "dog_images",
+    lambda: (
+        len(dog_image_cache),
+        dog_image_cache,
+        {"disk_bytes": dog_image_cache.total_bytes, "max_disk_bytes": dog_image_cache.max_bytes}
+    )
+)
@@ -0,0 +1,178 @@
+"""
+Tests for response compression helpers and middleware.
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+import compression
+import middleware
+from compression import CompressedBodyCache, compress, is_compressible_media_type, negotiate_encoding
+
+BODY = b'{"items": [' + b'{"id": 1, "name": "Leanne Graham"},' * 50 + b"]}"
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("gzip",))
+
+
+@pytest.fixture
+def br_and_gzip(monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("br", "gzip"))
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("br", "br"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0.1", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("GZIP;Q=1", "gzip"),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0.1", "gzip"),
+    ("*, br;q=0", "gzip"),
+    ("*;q=0", None),
+    ("gzip;q=abc", None),
+])
+def test_negotiate_encoding(br_and_gzip, header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_negotiate_encoding_ignores_unavailable_brotli(gzip_only):
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip;q=0.5") == "gzip"
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("application/json", True),
+    ("application/json; charset=utf-8", True),
+    ("text/html", True),
+    ("image/svg+xml", True),
+    ("image/jpeg", False),
+    ("application/octet-stream", False),
+    (None, False),
+])
+def test_is_compressible_media_type(content_type, expected):
+    assert is_compressible_media_type(content_type) is expected
+
+
+def test_compress_gzip_round_trips():
+    assert gzip.decompress(compress(BODY, "gzip")) == BODY
+
+
+def test_compress_rejects_unknown_encoding():
+    with pytest.raises(ValueError):
+        compress(BODY, "deflate")
+
+
+def test_body_cache_reuses_variant_for_same_version(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        compression, "compress", lambda body, encoding, precompressed: calls.append(encoding) or b"x"
+    )
+    cache = CompressedBodyCache()
+
+    cache.get_or_compress("users", 1, BODY, "gzip")
+    cache.get_or_compress("users", 1, BODY, "gzip")
+
+    assert calls == ["gzip"]
+    assert len(cache) == 1
+
+
+def test_body_cache_invalidates_on_new_version():
+    cache = CompressedBodyCache()
+    old = cache.get_or_compress("users", 1, BODY, "gzip")
+
+    new_body = BODY.replace(b"Leanne", b"Ervin")
+    new = cache.get_or_compress("users", 2, new_body, "gzip")
+
+    assert gzip.decompress(old) == BODY
+    assert gzip.decompress(new) == new_body
+    assert len(cache) == 1
+
+
+def test_body_cache_invalidate_drops_variants():
+    cache = CompressedBodyCache()
+    cache.get_or_compress("users", 1, BODY, "gzip")
+
+    cache.invalidate("users")
+
+    assert len(cache) == 0
+
+
+def make_client(version_holder=None):
+    app = FastAPI()
+    app.add_middleware(middleware.CompressionMiddleware)
+
+    @app.get("/large")
+    async def large(request: Request):
+        if version_holder is not None:
+            request.state.compression_cache_key = ("large", version_holder["version"])
+        return PlainTextResponse(BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse(b"{}", media_type="application/json")
+
+    @app.get("/image")
+    async def image():
+        return PlainTextResponse(BODY, media_type="image/jpeg")
+
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_bodies(gzip_only):
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == BODY
+
+
+def test_middleware_skips_bodies_below_threshold(gzip_only):
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == "2"
+
+
+def test_middleware_skips_incompressible_media_types(gzip_only):
+    response = make_client().get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_middleware_respects_identity(gzip_only):
+    response = make_client().get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_middleware_reuses_cached_variant_until_version_changes(gzip_only, monkeypatch):
+    cache = CompressedBodyCache()
+    monkeypatch.setattr(middleware, "compressed_body_cache", cache)
+    calls = []
+    real_compress = compression.compress
+    monkeypatch.setattr(
+        compression, "compress",
+        lambda body, encoding, precompressed: calls.append(encoding) or real_compress(body, encoding, precompressed)
+    )
+    version = {"version": 1}
+    client = make_client(version)
+
+    for _ in range(3):
+        assert client.get("/large", headers={"Accept-Encoding": "gzip"}).content == BODY
+    version["version"] = 2
+    client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert calls == ["gzip", "gzip"]
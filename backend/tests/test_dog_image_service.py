@@ -0,0 +1,79 @@
+"""
+Tests for the dog image proxy service.
+"""
+import asyncio
+
+from config import settings
+from image_cache import ImageCache
+from services import DogImageService
+
+IMAGE = b"\xff\xd8\xff" + b"dog" * 100
+
+
+class FakeAPIService:
+    """Stands in for ExternalAPIService, recording peak concurrency."""
+
+    def __init__(self, result=IMAGE, error=None):
+        self.result = result
+        self.error = error
+        self.active = 0
+        self.peak = 0
+
+    async def fetch_image(self, image_url):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.error is not None:
+                raise self.error
+            return self.result
+        finally:
+            self.active -= 1
+
+
+def make_service(tmp_path, api_service):
+    service = DogImageService(ImageCache(tmp_path, max_bytes=100_000))
+    service._api_service = api_service
+    return service
+
+
+def test_prefetch_caches_image_and_resolves_to_proxy_url(tmp_path):
+    service = make_service(tmp_path, FakeAPIService())
+    url = "https://images.dog.ceo/breeds/a.jpg"
+
+    async def scenario():
+        assert await service.resolve_image_url(url, "http://api/") == url
+        await asyncio.gather(*service._prefetch_tasks)
+        return await service.resolve_image_url(url, "http://api/")
+
+    proxied = asyncio.run(scenario())
+
+    assert proxied == f"http://api/content/dog/image/{service.cache.lookup_url(url)}"
+
+
+def test_prefetch_limits_concurrency_and_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "dog_image_prefetch_max_pending", 5)
+    api_service = FakeAPIService()
+    service = make_service(tmp_path, api_service)
+
+    async def scenario():
+        for i in range(20):
+            service.schedule_prefetch(f"https://images.dog.ceo/{i}.jpg")
+        scheduled = len(service._prefetch_tasks)
+        await asyncio.gather(*service._prefetch_tasks)
+        return scheduled
+
+    assert asyncio.run(scenario()) == 5
+    assert api_service.peak <= settings.dog_image_prefetch_concurrency
+
+
+def test_prefetch_failures_are_logged_not_raised(tmp_path, caplog):
+    service = make_service(tmp_path, FakeAPIService(error=ValueError("boom")))
+
+    async def scenario():
+        service.schedule_prefetch("https://images.dog.ceo/a.jpg")
+        return await asyncio.gather(*service._prefetch_tasks)
+
+    assert asyncio.run(scenario()) == [None]
+    assert not service._pending_urls
+    assert "boom" in caplog.text
@@ -0,0 +1,168 @@
+"""
+Tests for the content-addressed image cache.
+"""
+import hashlib
+import os
+
+import pytest
+
+from image_cache import ImageCache, sniff_media_type
+
+JPEG_HEADER = b"\xff\xd8\xff"
+
+
+def make_image(fill: bytes, size: int = 40) -> bytes:
+    return JPEG_HEADER + fill * (size - len(JPEG_HEADER))
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "images"
+
+
+def test_put_stores_content_addressed_file(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=1000)
+    data = make_image(b"a")
+
+    image_hash = cache.put("https://example.com/a.jpg", data)
+
+    assert image_hash == hashlib.sha256(data).hexdigest()
+    assert (cache_dir / image_hash).read_bytes() == data
+    assert cache.get(image_hash).media_type == "image/jpeg"
+    assert cache.lookup_url("https://example.com/a.jpg") == image_hash
+
+
+def test_identical_bytes_share_one_entry(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=1000)
+    data = make_image(b"a")
+
+    first = cache.put("https://example.com/a.jpg", data)
+    second = cache.put("https://example.com/copy.jpg", data)
+
+    assert first == second
+    assert len(cache) == 1
+    assert cache.total_bytes == len(data)
+
+
+def test_eviction_keeps_total_within_budget(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=100)
+
+    for fill in (b"a", b"b", b"c", b"d"):
+        cache.put(f"https://example.com/{fill.decode()}.jpg", make_image(fill))
+
+    assert len(cache) == 2
+    assert cache.total_bytes <= 100
+    assert sum(path.stat().st_size for path in cache_dir.iterdir() if path.is_file()) <= 100
+
+
+def test_eviction_drops_least_recently_used(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=100, touch_interval=0)
+    first = cache.put("https://example.com/a.jpg", make_image(b"a"))
+    second = cache.put("https://example.com/b.jpg", make_image(b"b"))
+
+    cache.get(first)
+    cache.put("https://example.com/c.jpg", make_image(b"c"))
+
+    assert cache.get(first) is not None
+    assert cache.get(second) is None
+    assert cache.lookup_url("https://example.com/b.jpg") is None
+
+
+def test_rejects_images_larger_than_budget(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=30)
+
+    assert cache.put("https://example.com/big.jpg", make_image(b"x")) is None
+    assert len(cache) == 0
+
+
+def test_get_rejects_malformed_hashes(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=100)
+
+    assert cache.get("../config.py") is None
+    assert cache.get("A" * 64) is None
+
+
+def test_get_indexes_images_written_by_another_instance(cache_dir):
+    writer = ImageCache(cache_dir, max_bytes=1000)
+    reader = ImageCache(cache_dir, max_bytes=1000)
+
+    image_hash = writer.put("https://example.com/a.jpg", make_image(b"a"))
+
+    assert reader.get(image_hash) is not None
+    assert reader.lookup_url("https://example.com/a.jpg") == image_hash
+
+
+def test_instances_sharing_a_directory_share_the_budget(cache_dir):
+    first = ImageCache(cache_dir, max_bytes=100, touch_interval=0)
+    second = ImageCache(cache_dir, max_bytes=100, touch_interval=0)
+
+    kept = first.put("https://example.com/a.jpg", make_image(b"a"))
+    evicted = second.put("https://example.com/b.jpg", make_image(b"b"))
+    second.get(kept)
+    first.put("https://example.com/c.jpg", make_image(b"c"))
+
+    assert sum(path.stat().st_size for path in cache_dir.iterdir() if path.is_file()) <= 100
+    assert first.get(evicted) is None
+    assert second.get(evicted) is None
+    assert second.get(kept) is not None
+
+
+def test_get_forgets_images_evicted_by_another_instance(cache_dir):
+    reader = ImageCache(cache_dir, max_bytes=100)
+    writer = ImageCache(cache_dir, max_bytes=100)
+    image_hash = reader.put("https://example.com/a.jpg", make_image(b"a"))
+
+    writer.put("https://example.com/b.jpg", make_image(b"b"))
+    writer.put("https://example.com/c.jpg", make_image(b"c"))
+
+    assert reader.get(image_hash) is None
+    assert reader.lookup_url("https://example.com/a.jpg") is None
+
+
+def test_eviction_prunes_url_index(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=100)
+    cache.put("https://example.com/a.jpg", make_image(b"a"))
+    kept = cache.put("https://example.com/b.jpg", make_image(b"b"))
+    # Sidecars written moments ago are left alone in case their image is still being stored
+    for path in (cache_dir / "urls").iterdir():
+        os.utime(path, (0, 0))
+
+    cache.put("https://example.com/c.jpg", make_image(b"c"))
+
+    sidecars = {path.name for path in (cache_dir / "urls").iterdir()}
+    assert sidecars == {
+        ImageCache.url_key("https://example.com/b.jpg"),
+        ImageCache.url_key("https://example.com/c.jpg"),
+    }
+    assert ImageCache(cache_dir, max_bytes=100).lookup_url("https://example.com/b.jpg") == kept
+
+
+def test_url_index_survives_restart(cache_dir):
+    image_hash = ImageCache(cache_dir, max_bytes=1000).put("https://example.com/a.jpg", make_image(b"a"))
+
+    restarted = ImageCache(cache_dir, max_bytes=1000)
+
+    assert len(restarted) == 1
+    assert restarted.lookup_url("https://example.com/a.jpg") == image_hash
+
+
+def test_discard_forgets_missing_file(cache_dir):
+    cache = ImageCache(cache_dir, max_bytes=1000)
+    image_hash = cache.put("https://example.com/a.jpg", make_image(b"a"))
+
+    (cache_dir / image_hash).unlink()
+    cache.discard(image_hash)
+
+    assert cache.get(image_hash) is None
+    assert cache.lookup_url("https://example.com/a.jpg") is None
+
+
+@pytest.mark.parametrize("head, media_type", [
+    (b"\xff\xd8\xff\xe0", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF89a", "image/gif"),
+    (b"RIFF\x00\x00\x00\x00WEBP", "image/webp"),
+    (b"<html>", "application/octet-stream"),
+])
+def test_sniff_media_type(head, media_type):
+    assert sniff_media_type(head) == media_type
@@ -0,0 +1,93 @@
+"""
+Tests for the pre-fork worker supervisor.
+"""
+import time
+
+import pytest
+
+from config import settings
+from launcher import WorkerSupervisor
+
+
+class FakeProcess:
+    """Stands in for a worker process, alive or already exited with ``exitcode``."""
+
+    pid = 1234
+
+    def __init__(self, exitcode=None):
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def join(self, timeout=None):
+        pass
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    monkeypatch.setattr(settings, "worker_startup_grace_seconds", 10)
+    monkeypatch.setattr(settings, "worker_restart_backoff_seconds", 0.0)
+    monkeypatch.setattr(settings, "worker_restart_backoff_max_seconds", 0.0)
+    monkeypatch.setattr(settings, "worker_max_startup_failures", 3)
+    return WorkerSupervisor(config=None, workers=2)
+
+
+def spawn_exiting_workers(supervisor, monkeypatch, exitcode):
+    spawned = []
+
+    def spawn_worker():
+        spawned.append(FakeProcess(exitcode))
+        return spawned[-1]
+
+    monkeypatch.setattr(supervisor, "_spawn_worker", spawn_worker)
+    return spawned
+
+
+def test_restart_delay_backs_off_exponentially(supervisor, monkeypatch):
+    monkeypatch.setattr(settings, "worker_restart_backoff_seconds", 0.5)
+    monkeypatch.setattr(settings, "worker_restart_backoff_max_seconds", 3)
+
+    delays = [supervisor._restart_delay(0, lifetime=0.1, exitcode=3) for _ in range(5)]
+
+    assert delays == [0.5, 1.0, 2.0, 3, 3]
+    assert supervisor._restart_delay(0, lifetime=60, exitcode=3) == 0.0
+    assert supervisor._startup_failures == [0, 0]
+
+
+def test_gives_up_after_repeated_startup_failures(supervisor, monkeypatch):
+    spawned = spawn_exiting_workers(supervisor, monkeypatch, exitcode=3)
+
+    supervisor._check_workers()
+    while not supervisor.should_exit.is_set():
+        supervisor._check_workers()
+
+    assert supervisor.exit_code == 1
+    assert max(supervisor._startup_failures) == settings.worker_max_startup_failures
+    assert len(spawned) == 2 * settings.worker_max_startup_failures
+
+
+def test_clean_exits_are_recycled_without_backoff(supervisor, monkeypatch):
+    spawned = spawn_exiting_workers(supervisor, monkeypatch, exitcode=0)
+
+    for _ in range(20):
+        supervisor._check_workers()
+
+    assert not supervisor.should_exit.is_set()
+    assert supervisor.exit_code == 0
+    assert supervisor._startup_failures == [0, 0]
+    assert len(spawned) == 2 * 20
+
+
+def test_healthy_sibling_does_not_reset_failing_slot(supervisor, monkeypatch):
+    spawn_exiting_workers(supervisor, monkeypatch, exitcode=3)
+    supervisor.processes = [FakeProcess(), None]
+    # The first worker has long been past startup
+    supervisor._started_at = [time.monotonic() - 100, 0.0]
+
+    for _ in range(settings.worker_max_startup_failures + 1):
+        supervisor._check_workers()
+
+    assert supervisor.processes[0].is_alive()
+    assert supervisor._startup_failures == [0, settings.worker_max_startup_failures]
+    assert supervisor.exit_code == 1
@@ -0,0 +1,77 @@
+"""
+Tests for the admin memory diagnostics endpoints.
+"""
+import os
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth import auth_service
+from main import app
+from memory_diagnostics import MemoryDiagnosticsService, deep_sizeof
+
+
+@pytest.fixture
+def client():
+    yield TestClient(app)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def auth_headers(username: str) -> dict:
+    return {"Authorization": f"Bearer {auth_service.create_access_token(username)}"}
+
+
+def test_requires_admin(client):
+    assert client.get("/admin/memory").status_code == 401
+    assert client.get("/admin/memory", headers=auth_headers("guest")).status_code == 403
+
+
+def test_report_lists_registered_caches(client):
+    response = client.get("/admin/memory", headers=auth_headers("admin"))
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["tracing"]["tracing"] is False
+    assert report["tracing"]["pid"] == os.getpid()
+    assert {"users", "secret_data", "dog_images", "compressed_bodies"} <= {c["name"] for c in report["caches"]}
+    assert [gen["generation"] for gen in report["gc"]] == [0, 1, 2]
+
+
+def test_snapshot_requires_tracing(client):
+    response = client.post("/admin/memory/snapshots", headers=auth_headers("admin"))
+
+    assert response.status_code == 409
+
+
+def test_snapshot_top_and_diff(client):
+    headers = auth_headers("admin")
+    client.post("/admin/memory/tracing/start?frames=3", headers=headers)
+    first = client.post("/admin/memory/snapshots", headers=headers).json()["id"]
+    retained = [bytearray(1024) for _ in range(100)]
+    second = client.post("/admin/memory/snapshots", headers=headers).json()["id"]
+
+    top = client.get(f"/admin/memory/snapshots/{second}?limit=5", headers=headers).json()
+    diff = client.get(f"/admin/memory/snapshots/{first}/diff/{second}", headers=headers).json()
+    stopped = client.post("/admin/memory/tracing/stop", headers=headers).json()
+
+    assert len(top["items"]) == 5
+    assert any("test_memory_diagnostics.py" in item["location"] for item in diff["items"])
+    assert stopped["tracing"] is False and stopped["snapshots"] == []
+    assert client.get(f"/admin/memory/snapshots/{second}", headers=headers).status_code == 404
+    del retained
+
+
+def test_traceback_locations_read_oldest_call_first():
+    frames = tracemalloc.Traceback(((__file__, 10), ("outer.py", 1)))
+
+    # tracemalloc stores frames newest first and exposes them oldest first
+    assert MemoryDiagnosticsService._format_location(frames, "traceback") == f"outer.py:1 -> {__file__}:10"
+
+
+def test_deep_sizeof_counts_contained_objects():
+    small = deep_sizeof([])
+    large = deep_sizeof([bytes(1000) + bytes([i]) for i in range(10)])
+
+    assert large - small >= 10_000
@@ -0,0 +1,79 @@
+"""
+Tests for serving cached images through the full middleware stack.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from image_cache import ImageCache
+from main import app
+from responses import ZEROCOPY_SEND_EXTENSION
+from services import dog_image_service
+
+IMAGE = b"\xff\xd8\xff" + b"dog" * 100
+
+
+@pytest.fixture
+def image_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(dog_image_service, "cache", ImageCache(tmp_path, max_bytes=10_000))
+    return dog_image_service.cache.put("https://example.com/test-dog.jpg", IMAGE)
+
+
+def call_app(path: str, extensions: dict) -> list:
+    """Call the ASGI app directly and collect the messages it sends."""
+    messages = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+        "extensions": extensions,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == ZEROCOPY_SEND_EXTENSION:
+            # Read while the response still holds the file open, as a server would
+            message = dict(message, data=message["file"].read(message["count"]))
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_zerocopy_send_passes_through_middleware(image_hash):
+    messages = call_app(f"/content/dog/image/{image_hash}", {ZEROCOPY_SEND_EXTENSION: {}})
+
+    start, body = messages
+    headers = dict(start["headers"])
+    assert start["status"] == 200
+    assert body["type"] == ZEROCOPY_SEND_EXTENSION
+    assert body["data"] == IMAGE
+    assert headers[b"content-length"] == str(len(IMAGE)).encode()
+    assert b"immutable" in headers[b"cache-control"]
+    assert b"content-encoding" not in headers
+
+
+def test_without_extension_falls_back_to_chunked_body(image_hash):
+    messages = call_app(f"/content/dog/image/{image_hash}", {})
+
+    assert messages[0]["status"] == 200
+    assert b"".join(m.get("body", b"") for m in messages[1:]) == IMAGE
+    assert all(m["type"] == "http.response.body" for m in messages[1:])
+
+
+def test_unknown_image_returns_404(image_hash):
+    response = TestClient(app).get(f"/content/dog/image/{'0' * 64}")
+
+    assert response.status_code == 404